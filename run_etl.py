@@ -4,13 +4,9 @@ Simple script to run the ETL pipeline
 """
 
 import sys
-import os
-
-# Add src directory to path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 try:
-    from banks_project import main
+    from src.banks_project import main
     print("Starting ETL Banks Project...")
     print("=" * 50)
     main()
@@ -0,0 +1,3 @@
+"""
+ETL Banks Project package
+"""
@@ -15,30 +15,106 @@ Enhanced with:
 import pandas as pd
 import numpy as np
 import requests
-from bs4 import BeautifulSoup
-from datetime import datetime
+import lxml.etree
+import lxml.html
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from io import StringIO
+from email.message import Message
 import sqlite3
+import csv
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import os
-import sys
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple, Union
 import logging
+import warnings
 
-# Add project root directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
+# Project settings from the package config (run as python -m src.banks_project)
 try:
-    from config import *
+    from .config import (
+        WIKIPEDIA_URL, TABLE_ATTRIBUTES, CSV_PATH, OUTPUT_CSV_PATH, DB_NAME,
+        TABLE_NAME, DB_PRAGMAS, LOG_PATH, LOG_FORMAT, DEFAULT_EXCHANGE_RATES
+    )
 except ImportError:
     # Default settings if config file is not available
+    warnings.warn(
+        "src.config could not be imported; falling back to default settings "
+        "with paths relative to the current directory",
+        RuntimeWarning
+    )
     WIKIPEDIA_URL = "https://web.archive.org/web/20230908091635/https://en.wikipedia.org/wiki/List_of_largest_banks"
     TABLE_ATTRIBUTES = ["Name", "MC_USD_Billion"]
     CSV_PATH = "./data/exchange_rate.csv"
+    OUTPUT_CSV_PATH = "./data/Largest_banks_data.csv"
     DB_NAME = 'Banks.db'
     TABLE_NAME = "Largest_banks"
+    DB_PRAGMAS = ["journal_mode=MEMORY", "synchronous=OFF", "temp_store=MEMORY", "cache_size=-65536"]
     LOG_PATH = "code_log.txt"
     LOG_FORMAT = '%Y-%b-%d-%H:%M:%S'
     DEFAULT_EXCHANGE_RATES = {'EUR': 0.93, 'GBP': 0.8, 'INR': 82.95}
 
+# Shared HTTP session so repeated requests reuse pooled keep-alive connections
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                       max_retries=Retry(total=3, backoff_factor=0.3))
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)
+
+# Ask for a compressed transfer; requests decompresses transparently.
+# Set once on the session so every request sent through it carries them
+REQUEST_HEADERS = {
+    'Accept-Encoding': 'gzip, deflate',
+    'User-Agent': 'ETL-Banks-Project/1.0 (+https://github.com/aly-elbana/ETL-Bank-Project)'
+}
+_SESSION.headers.update(REQUEST_HEADERS)
+
+# Compiled once at import: tables whose class list contains "wikitable"
+_WIKITABLE_XPATH = lxml.etree.XPath(
+    "//table[contains(concat(' ', normalize-space(@class), ' '), ' wikitable ')]"
+)
+# Positions of the bank name and market cap columns in the wikitable
+_TABLE_COLUMNS = [1, 2]
+
+# Logging setup
+class _RaisingFileHandler(logging.FileHandler):
+    """
+    FileHandler that propagates write errors to the caller instead of
+    printing them to stderr, so log_progress can report them
+    """
+
+    def handleError(self, record: logging.LogRecord) -> None:
+        raise
+
+_LOGGER = logging.getLogger('etl')
+_LOGGER.setLevel(logging.INFO)
+_LOGGER.propagate = False
+
+def _get_logger(log_file: str) -> logging.Logger:
+    """
+    Return the pipeline logger, writing to log_file through a long-lived handler
+
+    The file is opened once and kept open, instead of being reopened for
+    every message. Each record is still flushed to disk as it is logged.
+    When a different log file is requested, the previous handler is closed
+    and replaced.
+
+    Args:
+        log_file: Path to log file
+
+    Returns:
+        Logger bound to the given log file
+    """
+    path = os.path.abspath(log_file)
+    if not any(handler.baseFilename == path for handler in _LOGGER.handlers):
+        for handler in list(_LOGGER.handlers):
+            _LOGGER.removeHandler(handler)
+            handler.close()
+        file_handler = _RaisingFileHandler(path, encoding='utf-8')
+        file_handler.setFormatter(logging.Formatter('%(asctime)s : %(message)s', datefmt=LOG_FORMAT))
+        _LOGGER.addHandler(file_handler)
+    return _LOGGER
+
 # Logging function
 def log_progress(message: str, log_file: str = None) -> None:
     """
@@ -52,13 +128,93 @@ def log_progress(message: str, log_file: str = None) -> None:
         log_file = LOG_PATH
     
     try:
-        stamp = datetime.now().strftime(LOG_FORMAT)
-        with open(log_file, "a", encoding='utf-8') as file:
-            file.write(f"{stamp} : {message}\n")
+        _get_logger(log_file).info(message)
         print(f"[OK] {message}")  # Also print to console
     except Exception as e:
         print(f"Logging error: {e}")
 
+# Exchange rates loader
+@functools.lru_cache(maxsize=4)
+def _load_rates(csv_path: str, mtime: float) -> Dict[str, float]:
+    """
+    Parse the exchange rates CSV into a currency -> rate mapping
+
+    Results are cached per (path, mtime), so the file is only re-read
+    after it changes on disk.
+
+    Args:
+        csv_path: Path to exchange rates CSV file
+        mtime: Modification time of the file, used as cache key
+
+    Returns:
+        Dictionary of exchange rates keyed by currency code
+    """
+    with open(csv_path, newline='', encoding='utf-8') as file:
+        return {row['Currency']: float(row['Rate']) for row in csv.DictReader(file)}
+
+# Fetch helper
+def _fetch(url: str) -> Tuple[bytes, Optional[str]]:
+    """
+    Download a page through the shared HTTP session
+
+    Args:
+        url: Page URL
+
+    Returns:
+        Raw response body and the charset declared in the Content-Type
+        header (None when the header does not declare one)
+    """
+    response = _SESSION.get(url, timeout=30)
+    response.raise_for_status()
+    # Only a charset the server actually declared is kept; requests' own
+    # ISO-8859-1 default for text/* would override the page's <meta charset>
+    content_type = Message()
+    content_type['Content-Type'] = response.headers.get('Content-Type', '')
+    return response.content, content_type.get_content_charset()
+
+# Parse helper
+def _parse(html: bytes, table_attribs: List[str], encoding: Optional[str] = None) -> pd.DataFrame:
+    """
+    Parse the first wikitable of a page into a banks DataFrame
+
+    Args:
+        html: Raw page body
+        table_attribs: Required column names
+        encoding: Charset declared by the server (optional)
+
+    Returns:
+        DataFrame with bank names and positive USD market caps
+    """
+    # Locate the first wikitable (class may carry extra tokens such as
+    # "sortable") and let pandas build the frame with the lxml parser.
+    # Raw bytes go to lxml, decoded with the declared charset if there is
+    # one, otherwise sniffed from the page, without a separate decode pass
+    parser = lxml.html.HTMLParser(encoding=encoding) if encoding else None
+    root = lxml.html.fromstring(html, parser=parser)
+    tables = _WIKITABLE_XPATH(root)
+
+    if not tables:
+        raise ValueError("Required tables not found")
+
+    target_table = lxml.html.tostring(tables[0], encoding='unicode')
+    df = pd.read_html(StringIO(target_table), flavor='lxml')[0]
+    df = df.iloc[:, _TABLE_COLUMNS].copy()
+    df.columns = table_attribs
+    # Clean and parse the whole column at once; unparseable values become
+    # NaN and are dropped by the positivity mask
+    market_cap = df['MC_USD_Billion'].astype('string').str.replace(r'[,\n]', '', regex=True)
+    df['MC_USD_Billion'] = pd.to_numeric(market_cap, errors='coerce').astype('float64')
+    df = df[df['MC_USD_Billion'].gt(0)].reset_index(drop=True)  # Ensure positive value
+
+    if df.empty:
+        raise ValueError("No valid data found")
+
+    # Categorical names share a single string pool. Market caps stay
+    # float64: float32 keeps ~7 significant digits, which is not enough
+    # for cent-accurate INR conversions
+    df['Name'] = df['Name'].astype('category')
+    return df
+
 # Extract function
 def extract(url: str, table_attribs: List[str]) -> pd.DataFrame:
     """
@@ -74,37 +230,9 @@ def extract(url: str, table_attribs: List[str]) -> pd.DataFrame:
     try:
         log_progress("Starting data extraction from Wikipedia...")
         
-        # Send HTTP request with error handling
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        tables = soup.find_all('table', {'class': 'wikitable'})
-        
-        if not tables:
-            raise ValueError("Required tables not found")
-        
-        target_table = tables[0]
-        rows = target_table.find_all('tr')
-        data = []
-
-        for row in rows[1:]:  # Skip table header
-            cols = row.find_all(['td', 'th'])
-            if len(cols) >= 3:
-                name = cols[1].text.strip()
-                mc = cols[2].text.strip().replace('\n', '').replace(',', '')
-                
-                try:
-                    mc_value = float(mc)
-                    if mc_value > 0:  # Ensure positive value
-                        data.append([name, mc_value])
-                except (ValueError, TypeError):
-                    continue
-
-        if not data:
-            raise ValueError("No valid data found")
-
-        df = pd.DataFrame(data, columns=table_attribs)
+        html, encoding = _fetch(url)
+        df = _parse(html, table_attribs, encoding)
+
         log_progress(f"Successfully extracted {len(df)} banks")
         return df
         
@@ -115,6 +243,63 @@ def extract(url: str, table_attribs: List[str]) -> pd.DataFrame:
         log_progress(f"Extraction error: {e}")
         raise
 
+# Multi-source extract function
+def extract_many(urls: List[str], table_attribs: List[str], max_workers: int = 8) -> pd.DataFrame:
+    """
+    Extract and combine banking data from several pages
+
+    Pages are downloaded concurrently over the shared session's connection
+    pool; parsing is CPU-bound and runs sequentially afterwards.
+
+    Args:
+        urls: Page URLs
+        table_attribs: Required column names
+        max_workers: Maximum number of concurrent downloads
+
+    Returns:
+        DataFrame containing extracted data from all pages, in URL order
+    """
+    try:
+        if not urls:
+            raise ValueError("No source URLs given")
+
+        log_progress(f"Starting data extraction from {len(urls)} sources...")
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pages = list(executor.map(_fetch, urls))
+
+        df = pd.concat([_parse(html, table_attribs, encoding) for html, encoding in pages], ignore_index=True)
+        df['Name'] = df['Name'].astype('category')
+
+        log_progress(f"Successfully extracted {len(df)} banks")
+        return df
+
+    except requests.RequestException as e:
+        log_progress(f"Connection error: {e}")
+        raise
+    except Exception as e:
+        log_progress(f"Extraction error: {e}")
+        raise
+
+# Currency conversion kernel
+def _convert_currencies(usd: np.ndarray, rates: np.ndarray) -> np.ndarray:
+    """
+    Convert USD amounts into several currencies, rounded to 2 decimals
+
+    Writes into a single preallocated (n, len(rates)) array with in-place
+    ufuncs, so no temporaries are created between the multiply and round.
+
+    Args:
+        usd: 1-D float64 array of USD amounts
+        rates: 1-D float64 array of exchange rates
+
+    Returns:
+        Array with one column per rate
+    """
+    out = np.empty((usd.shape[0], rates.shape[0]), dtype=np.float64)
+    np.multiply(usd[:, None], rates, out=out)
+    return np.round(out, 2, out=out)
+
 # Transform function
 def transform(df: pd.DataFrame, csv_path: str) -> pd.DataFrame:
     """
@@ -131,17 +316,20 @@ def transform(df: pd.DataFrame, csv_path: str) -> pd.DataFrame:
         log_progress("Starting data transformation...")
         
         # Load exchange rates with error handling
-        if os.path.exists(csv_path):
-            rates_df = pd.read_csv(csv_path)
-            exchange_rate = rates_df.set_index('Currency').to_dict()['Rate']
-        else:
+        try:
+            exchange_rate = _load_rates(csv_path, os.path.getmtime(csv_path))
+        except FileNotFoundError:
             log_progress("Exchange rates CSV not found, using default rates")
             exchange_rate = DEFAULT_EXCHANGE_RATES
 
-        # Add currency conversions
-        df['MC_GBP_Billion'] = [np.round(x * exchange_rate['GBP'], 2) for x in df['MC_USD_Billion']]
-        df['MC_EUR_Billion'] = [np.round(x * exchange_rate['EUR'], 2) for x in df['MC_USD_Billion']]
-        df['MC_INR_Billion'] = [np.round(x * exchange_rate['INR'], 2) for x in df['MC_USD_Billion']]
+        # Add currency conversions (one broadcast multiply for all currencies)
+        usd = df['MC_USD_Billion'].to_numpy(dtype=np.float64, copy=False)
+        rates = np.array([exchange_rate['GBP'], exchange_rate['EUR'], exchange_rate['INR']], dtype=np.float64)
+        conv = _convert_currencies(usd, rates)
+        converted = pd.DataFrame(conv, columns=['MC_GBP_Billion', 'MC_EUR_Billion', 'MC_INR_Billion'],
+                                 index=df.index)
+        # Replace any conversions from an earlier run instead of duplicating them
+        df = pd.concat([df.drop(columns=converted.columns, errors='ignore'), converted], axis=1)
 
         log_progress("Data transformation complete. Initiating Loading process")
         return df
@@ -162,12 +350,38 @@ def load_to_csv(df: pd.DataFrame, output_path: str) -> None:
     try:
         # Ensure output directory exists
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        df.to_csv(output_path, index=False)
+        # Stream rows as plain tuples through csv.writer (the same tuple
+        # source as load_to_db), bypassing the pandas CSV formatter; the
+        # 1 MiB buffer collapses the output into a few write() calls
+        missing = df.isna()
+        rows = df.astype(object).where(~missing, '') if missing.to_numpy().any() else df
+
+        with open(output_path, 'w', buffering=1 << 20, encoding='utf-8', newline='') as file:
+            writer = csv.writer(file, lineterminator=os.linesep)
+            writer.writerow(df.columns)
+            # Missing values are written as empty fields, as DataFrame.to_csv does
+            writer.writerows(rows.itertuples(index=False, name=None))
         log_progress(f"Data saved to CSV file: {output_path}")
     except Exception as e:
         log_progress(f"CSV save error: {e}")
         raise
 
+def _sqlite_type(dtype) -> str:
+    """
+    Map a pandas dtype to a SQLite column type
+
+    Args:
+        dtype: pandas/numpy dtype of a column
+
+    Returns:
+        SQLite type name
+    """
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    return "TEXT"
+
 def load_to_db(df: pd.DataFrame, sql_connection, table_name: str) -> None:
     """
     Load DataFrame to SQLite database
@@ -178,28 +392,58 @@ def load_to_db(df: pd.DataFrame, sql_connection, table_name: str) -> None:
         table_name: Target table name
     """
     try:
-        df.to_sql(table_name, sql_connection, if_exists='replace', index=False)
+        columns = ", ".join(
+            f'"{col}" {_sqlite_type(dtype)}' for col, dtype in df.dtypes.items()
+        )
+        placeholders = ", ".join("?" * len(df.columns))
+
+        # Replace the table and insert all rows in a single transaction. The
+        # explicit BEGIN is needed because sqlite3 does not open a transaction
+        # before DDL, which would let DROP/CREATE autocommit on their own;
+        # it is skipped when the caller already has a transaction open
+        with sql_connection:
+            if not sql_connection.in_transaction:
+                sql_connection.execute("BEGIN")
+            sql_connection.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+            sql_connection.execute(f'CREATE TABLE "{table_name}" ({columns})')
+            sql_connection.executemany(
+                f'INSERT INTO "{table_name}" VALUES ({placeholders})',
+                df.itertuples(index=False, name=None)
+            )
         log_progress("Data loaded to Database as a table, Executing queries")
     except Exception as e:
         log_progress(f"Database load error: {e}")
         raise
 
 # Run query function
-def run_query(query_statement: str, sql_connection) -> pd.DataFrame:
+def run_query(query_statement: str, sql_connection,
+              return_df: bool = True) -> Union[pd.DataFrame, List[tuple]]:
     """
     Execute SQL query and return results
     
     Args:
         query_statement: SQL query string
         sql_connection: SQLite connection object
+        return_df: Build a DataFrame from the results (set False for
+            diagnostic queries that only need printing)
         
     Returns:
-        Query results as DataFrame
+        Query results as DataFrame, or as a list of row tuples when
+        return_df is False
     """
     try:
         print(f"\nRunning Query: {query_statement}\n")
-        query_output = pd.read_sql(query_statement, sql_connection)
-        print(query_output)
+        if return_df:
+            query_output = pd.read_sql(query_statement, sql_connection)
+            print(query_output)
+        else:
+            cursor = sql_connection.execute(query_statement)
+            query_output = cursor.fetchall()
+            # description is None for statements that return no rows
+            if cursor.description is not None:
+                print(tuple(col[0] for col in cursor.description))
+            for row in query_output:
+                print(row)
         log_progress("Query executed successfully")
         return query_output
     except Exception as e:
@@ -215,6 +459,8 @@ def main():
         
         # Initialize database connection
         sql_connection = sqlite3.connect(DB_NAME)
+        for pragma in DB_PRAGMAS:
+            sql_connection.execute(f"PRAGMA {pragma}")
         log_progress("SQL Connection initiated")
 
         # Run ETL pipeline step-by-step
@@ -233,9 +479,9 @@ def main():
         load_to_db(transformed_data, sql_connection, TABLE_NAME)
 
         log_progress("Step 4: Running Queries")
-        run_query("SELECT * FROM Largest_banks", sql_connection)
-        run_query("SELECT AVG(MC_GBP_Billion) FROM Largest_banks", sql_connection)
-        run_query("SELECT Name FROM Largest_banks LIMIT 5", sql_connection)
+        run_query("SELECT * FROM Largest_banks", sql_connection, return_df=False)
+        run_query("SELECT AVG(MC_GBP_Billion) FROM Largest_banks", sql_connection, return_df=False)
+        run_query("SELECT Name FROM Largest_banks LIMIT 5", sql_connection, return_df=False)
 
         sql_connection.close()
         log_progress("ETL Process completed successfully!")
@@ -7,7 +7,7 @@ import os
 WIKIPEDIA_URL = "https://web.archive.org/web/20230908091635/https://en.wikipedia.org/wiki/List_of_largest_banks"
 
 # File paths
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 CSV_PATH = os.path.join(DATA_DIR, "exchange_rate.csv")
 OUTPUT_CSV_PATH = os.path.join(DATA_DIR, "Largest_banks_data.csv")
@@ -18,6 +18,14 @@ LOG_PATH = os.path.join(BASE_DIR, "code_log.txt")
 DB_NAME = "Banks.db"
 TABLE_NAME = "Largest_banks"
 
+# The table is rebuilt on every run, so durability is traded for speed
+DB_PRAGMAS = [
+    "journal_mode=MEMORY",
+    "synchronous=OFF",
+    "temp_store=MEMORY",
+    "cache_size=-65536"
+]
+
 # Table attributes
 TABLE_ATTRIBUTES = ["Name", "MC_USD_Billion"]
 
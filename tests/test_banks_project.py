@@ -0,0 +1,55 @@
+"""
+Tests for the ETL pipeline extraction helpers
+"""
+
+import unittest
+from unittest import mock
+
+import requests
+
+from src import banks_project
+
+TABLE_ATTRIBUTES = ["Name", "MC_USD_Billion"]
+
+TABLE = (
+    '<table class="wikitable sortable">'
+    '<tr><th>Rank</th><th>Bank name</th><th>Market cap (US$ billion)</th></tr>'
+    '<tr><td>1</td><td>Société Générale</td><td>1,234.5</td></tr>'
+    '</table>'
+)
+
+
+def make_response(body: bytes, content_type: str) -> requests.Response:
+    """
+    Build a canned HTTP response
+    """
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body
+    response.headers['Content-Type'] = content_type
+    return response
+
+
+class FetchAndParseEncodingTest(unittest.TestCase):
+
+    def fetch_names(self, page: str, content_type: str):
+        response = make_response(page.encode('utf-8'), content_type)
+        with mock.patch.object(banks_project._SESSION, 'get', return_value=response):
+            html, encoding = banks_project._fetch('http://example.test/banks')
+        df = banks_project._parse(html, TABLE_ATTRIBUTES, encoding)
+        return list(df['Name']), list(df['MC_USD_Billion'])
+
+    def test_header_charset_used_without_meta_charset(self):
+        page = f'<html><body>{TABLE}</body></html>'
+        names, caps = self.fetch_names(page, 'text/html; charset=UTF-8')
+        self.assertEqual(names, ['Société Générale'])
+        self.assertEqual(caps, [1234.5])
+
+    def test_meta_charset_used_without_header_charset(self):
+        page = f'<html><head><meta charset="utf-8"></head><body>{TABLE}</body></html>'
+        names, _ = self.fetch_names(page, 'text/html')
+        self.assertEqual(names, ['Société Générale'])
+
+
+if __name__ == '__main__':
+    unittest.main()